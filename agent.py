@@ -1,16 +1,26 @@
 import os
 import re
+import sys
 import json
 import logging
 import requests
-from typing import Dict, List, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Any, NamedTuple, Optional, Union
 
 from openai import OpenAI
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 
+# orjson is a C JSON codec, several times faster than stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from retriever import hybrid_search, search_all_collections
-from classifier import get_classifier
+from cache import get_cache, make_key
+from embedder import load_embedder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -24,9 +34,173 @@ MCP_SERVER_PORT = int(os.getenv("MCP_SERVER_PORT", "8001"))
 MCP_SERVER_URL = f"http://localhost:{MCP_SERVER_PORT}"
 MAX_CONTEXT_LENGTH = 1024  # Adjust based on model requirements
 
-# Initialize models
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
-classifier = get_classifier()
+# Entity extraction pattern, compiled once at import. google-re2 gives a
+# linear-time DFA scan when available; stdlib re is the fallback.
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+_ENTITY_RE = _re_engine.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+
+# Common capitalized words that are not entity names. Interned so membership
+# checks against regex matches can use pointer equality where possible.
+_COMMON_WORDS = frozenset(sys.intern(word) for word in (
+    "The", "A", "An", "In", "On", "At", "From", "To", "With", "By", "About"
+))
+
+# Keywords that suggest sports information is needed
+SPORTS_KEYWORDS = tuple(sys.intern(word) for word in (
+    "score", "game", "match", "team", "player", "sport", "league", "championship",
+    "tournament", "win", "lose", "play", "coach", "stadium", "last night",
+    "yesterday", "upcoming", "schedule", "roster", "lineup", "stats", "statistics"
+))
+
+# Aho-Corasick automaton matches all keywords in one linear pass over the
+# query; fall back to a plain substring scan when pyahocorasick is missing.
+try:
+    import ahocorasick
+
+    _MCP_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in SPORTS_KEYWORDS:
+        _MCP_AUTOMATON.add_word(_keyword, _keyword)
+    _MCP_AUTOMATON.make_automaton()
+except ImportError:
+    _MCP_AUTOMATON = None
+
+# Shared HTTP session for MCP calls: keep-alive connection pooling instead
+# of a fresh TCP handshake per request
+_MCP_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+)
+_MCP_SESSION.mount("http://", _adapter)
+_MCP_SESSION.mount("https://", _adapter)
+
+# (connect, read) timeouts for MCP requests in seconds
+_MCP_TIMEOUT = (1, 5)
+
+# Worker pool used to overlap retrieval, classification, and MCP HTTP calls
+_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Fixed instruction appended to every LLM prompt
+_PROMPT_TRAILER = (
+    "Based on the user query and the provided context and live data, answer the user's query.\n\n"
+    "Answer:"
+)
+
+# Rough average characters per token for English text, used to convert the
+# MAX_CONTEXT_LENGTH token budget into a character budget for snippets
+_CHARS_PER_TOKEN = 4
+
+
+class TeamResult(NamedTuple):
+    """Team entry parsed from an MCP sports-search response."""
+    id: str
+    name: str
+    sport: str
+    league: str
+
+
+class PlayerResult(NamedTuple):
+    """Player entry parsed from an MCP sports-search response."""
+    name: str
+    team: str
+    position: str
+
+
+class Event(NamedTuple):
+    """Event entry parsed from an MCP latest-events response."""
+    name: str
+    date: str
+    status: str
+    home_score: str
+    away_score: str
+    venue: str
+
+
+def _parse_mcp_results(results: List[Dict[str, Any]]) -> List[Union[TeamResult, PlayerResult]]:
+    """Parse raw MCP search-result dicts into typed tuples once at the boundary."""
+    parsed = []
+    for result in results:
+        result_type = result.get("type")
+        if result_type == "team":
+            parsed.append(TeamResult(
+                id=result.get("id", ""),
+                name=result.get("name", "Unknown"),
+                sport=result.get("sport", "Unknown"),
+                league=result.get("league", "Unknown")
+            ))
+        elif result_type == "player":
+            parsed.append(PlayerResult(
+                name=result.get("name", "Unknown"),
+                team=result.get("team", "Unknown"),
+                position=result.get("position", "Unknown")
+            ))
+    return parsed
+
+
+def _parse_mcp_events(events: List[Dict[str, Any]]) -> List[Event]:
+    """Parse raw MCP event dicts into typed tuples once at the boundary."""
+    return [
+        Event(
+            name=event.get("name", "Unknown"),
+            date=event.get("date", "Unknown"),
+            status=event.get("status", "upcoming"),
+            home_score=event.get("home_score", "?"),
+            away_score=event.get("away_score", "?"),
+            venue=event.get("venue", "Unknown")
+        )
+        for event in events
+    ]
+
+# Models, loaded lazily so importing this module stays cheap for callers
+# that only need the pure-Python helpers
+_embedder = None
+_classifier = None
+_torch_threads_tuned = False
+
+
+def _tune_torch_threads() -> None:
+    """Cap torch thread counts once so model GEMMs don't oversubscribe cores."""
+    global _torch_threads_tuned
+
+    if _torch_threads_tuned:
+        return
+
+    try:
+        import torch
+        torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+        torch.set_num_interop_threads(2)
+    except (ImportError, RuntimeError) as e:
+        # set_num_interop_threads raises if parallel work already started
+        logger.debug(f"Skipping torch thread tuning: {e}")
+    _torch_threads_tuned = True
+
+
+def _get_embedder():
+    """Get or load the shared query embedder."""
+    global _embedder
+
+    if _embedder is None:
+        _embedder = load_embedder()
+        _tune_torch_threads()
+
+    return _embedder
+
+
+def _get_classifier():
+    """Get or load the shared content classifier."""
+    global _classifier
+
+    if _classifier is None:
+        from classifier import get_classifier
+        _classifier = get_classifier()
+        _tune_torch_threads()
+
+    return _classifier
 
 # Initialize OpenAI client
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -59,13 +233,10 @@ def extract_entities(text: str) -> List[str]:
     """
     # Simple regex-based extraction
     # Look for capitalized words that might be names
-    potential_entities = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-    
+    potential_entities = _ENTITY_RE.findall(text)
+
     # Filter out common words that start with capital letters
-    common_words = {"The", "A", "An", "In", "On", "At", "From", "To", "With", "By", "About"}
-    filtered_entities = [entity for entity in potential_entities if entity not in common_words]
-    
-    return filtered_entities
+    return [entity for entity in potential_entities if entity not in _COMMON_WORDS]
 
 def needs_mcp_integration(query: str) -> bool:
     """
@@ -77,20 +248,30 @@ def needs_mcp_integration(query: str) -> bool:
     Returns:
         True if MCP integration is likely needed, False otherwise
     """
-    # Keywords that suggest sports information is needed
-    sports_keywords = [
-        "score", "game", "match", "team", "player", "sport", "league", "championship",
-        "tournament", "win", "lose", "play", "coach", "stadium", "last night",
-        "yesterday", "upcoming", "schedule", "roster", "lineup", "stats", "statistics"
-    ]
-    
     # Check if any of the keywords are in the query
     query_lower = query.lower()
-    for keyword in sports_keywords:
-        if keyword in query_lower:
-            return True
-    
-    return False
+
+    if _MCP_AUTOMATON is not None:
+        return next(_MCP_AUTOMATON.iter(query_lower), None) is not None
+
+    return any(keyword in query_lower for keyword in SPORTS_KEYWORDS)
+
+def _post_mcp(url: str, payload: Dict[str, Any]) -> requests.Response:
+    """POST a JSON payload to the MCP server, serializing with orjson when available."""
+    if orjson is not None:
+        return _MCP_SESSION.post(
+            url,
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=_MCP_TIMEOUT
+        )
+    return _MCP_SESSION.post(url, json=payload, timeout=_MCP_TIMEOUT)
+
+def _parse_mcp_response(response: requests.Response) -> Dict[str, Any]:
+    """Parse a JSON response body, preferring orjson when available."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
 
 def call_mcp_sports_search(entity: str) -> Dict[str, Any]:
     """
@@ -103,13 +284,10 @@ def call_mcp_sports_search(entity: str) -> Dict[str, Any]:
         Search results from the MCP server
     """
     try:
-        response = requests.post(
-            f"{MCP_SERVER_URL}/mcp/sports-search",
-            json={"query": entity}
-        )
-        
+        response = _post_mcp(f"{MCP_SERVER_URL}/mcp/sports-search", {"query": entity})
+
         if response.status_code == 200:
-            return response.json()
+            return _parse_mcp_response(response)
         else:
             logger.error(f"MCP sports search failed: {response.status_code} - {response.text}")
             return {"results": [], "query": entity, "source": "TheSportsDB"}
@@ -134,13 +312,13 @@ def call_mcp_latest_events(team_id: Optional[str] = None, team_name: Optional[st
         return {"events": [], "team_info": {}, "source": "TheSportsDB"}
     
     try:
-        response = requests.post(
+        response = _post_mcp(
             f"{MCP_SERVER_URL}/mcp/latest-events",
-            json={"team_id": team_id, "team_name": team_name}
+            {"team_id": team_id, "team_name": team_name}
         )
-        
+
         if response.status_code == 200:
-            return response.json()
+            return _parse_mcp_response(response)
         else:
             logger.error(f"MCP latest events failed: {response.status_code} - {response.text}")
             return {"events": [], "team_info": {}, "source": "TheSportsDB"}
@@ -167,96 +345,85 @@ def build_llm_prompt(
     Returns:
         The formatted prompt
     """
-    prompt = f"User Query: {user_query}\n\n"
-    
+    # Accumulate pieces in a list and join once at the end, avoiding
+    # quadratic string concatenation inside the loops
+    parts = [f"User Query: {user_query}\n\n"]
+
     # Add RAG snippets
     if rag_snippets:
-        prompt += "Context from Documents:\n"
+        # Split the remaining context budget evenly across snippets instead
+        # of a fixed per-snippet cap, so the full context window is used and
+        # nothing is silently dropped by a second truncation later
+        overhead = len(parts[0]) + len(_PROMPT_TRAILER)
+        context_budget = MAX_CONTEXT_LENGTH * _CHARS_PER_TOKEN - overhead
+        per_snippet_budget = max(100, context_budget // len(rag_snippets))
+
+        parts.append("Context from Documents:\n")
         for i, snippet in enumerate(rag_snippets):
             snippet_id = snippet.get("id", f"snippet_{i}")
             content = snippet.get("content", "")
             metadata = snippet.get("metadata", {})
-            
+
             source = metadata.get("source", "Unknown")
             category = metadata.get("category", "Unknown")
-            
+
             # Get tags for this snippet
             snippet_tags = tags.get(snippet_id, [])
             tags_str = ", ".join(snippet_tags) if snippet_tags else "Unclassified"
-            
-            prompt += f"[Snippet {i+1} (Source: {source}, Category: {category}, Tags: {tags_str})]\n"
-            
-            # Truncate content if it's too long
-            max_snippet_length = 200  # Adjust as needed
-            if len(content) > max_snippet_length:
-                content = content[:max_snippet_length] + "..."
-            
-            prompt += f"{content}\n\n"
-    
+
+            parts.append(f"[Snippet {i+1} (Source: {source}, Category: {category}, Tags: {tags_str})]\n")
+
+            # Truncate content if it exceeds its share of the budget
+            if len(content) > per_snippet_budget:
+                content = content[:per_snippet_budget] + "..."
+
+            parts.append(f"{content}\n\n")
+
     # Add MCP data if available
     if mcp_data:
-        prompt += "Live Sports Data:\n"
-        
-        # Format MCP data based on what's available
+        parts.append("Live Sports Data:\n")
+
+        # Parse the raw MCP dicts into typed tuples once, then format via
+        # attribute access instead of repeated dict.get chains
         if "results" in mcp_data:
             # Search results
-            prompt += f"Search results for '{mcp_data.get('query', '')}':\n"
-            for i, result in enumerate(mcp_data.get("results", [])[:3]):  # Limit to top 3
-                result_type = result.get("type", "Unknown")
-                name = result.get("name", "Unknown")
-                
-                if result_type == "team":
-                    sport = result.get("sport", "Unknown")
-                    league = result.get("league", "Unknown")
-                    prompt += f"- Team: {name} (Sport: {sport}, League: {league})\n"
-                elif result_type == "player":
-                    team = result.get("team", "Unknown")
-                    position = result.get("position", "Unknown")
-                    prompt += f"- Player: {name} (Team: {team}, Position: {position})\n"
-        
+            parts.append(f"Search results for '{mcp_data.get('query', '')}':\n")
+            for result in _parse_mcp_results(mcp_data.get("results", [])[:3]):  # Limit to top 3
+                if isinstance(result, TeamResult):
+                    parts.append(f"- Team: {result.name} (Sport: {result.sport}, League: {result.league})\n")
+                else:
+                    parts.append(f"- Player: {result.name} (Team: {result.team}, Position: {result.position})\n")
+
         if "events" in mcp_data:
             # Events data
             team_info = mcp_data.get("team_info", {})
             team_name = team_info.get("name", "Unknown")
-            
-            prompt += f"Events for {team_name}:\n"
-            
+
+            parts.append(f"Events for {team_name}:\n")
+
             # Group events by status
-            completed_events = []
-            upcoming_events = []
-            
-            for event in mcp_data.get("events", []):
-                if event.get("status") == "completed":
-                    completed_events.append(event)
-                else:
-                    upcoming_events.append(event)
-            
+            events = _parse_mcp_events(mcp_data.get("events", []))
+            completed_events = [event for event in events if event.status == "completed"]
+            upcoming_events = [event for event in events if event.status != "completed"]
+
             # Add completed events
             if completed_events:
-                prompt += "Recent results:\n"
+                parts.append("Recent results:\n")
                 for event in completed_events[:3]:  # Limit to top 3
-                    name = event.get("name", "Unknown")
-                    date = event.get("date", "Unknown")
-                    home_score = event.get("home_score", "?")
-                    away_score = event.get("away_score", "?")
-                    prompt += f"- {name} ({date}): {home_score}-{away_score}\n"
-            
+                    parts.append(f"- {event.name} ({event.date}): {event.home_score}-{event.away_score}\n")
+
             # Add upcoming events
             if upcoming_events:
-                prompt += "Upcoming matches:\n"
+                parts.append("Upcoming matches:\n")
                 for event in upcoming_events[:3]:  # Limit to top 3
-                    name = event.get("name", "Unknown")
-                    date = event.get("date", "Unknown")
-                    venue = event.get("venue", "Unknown")
-                    prompt += f"- {name} ({date} at {venue})\n"
-        
-        prompt += "\n"
-    
+                    parts.append(f"- {event.name} ({event.date} at {event.venue})\n")
+
+        parts.append("\n")
+
     # Add instruction for the LLM
-    prompt += "Based on the user query and the provided context and live data, answer the user's query.\n\n"
-    prompt += "Answer:"
-    
-    return prompt
+    parts.append(_PROMPT_TRAILER)
+
+    return "".join(parts)
 
 def run_query(user_query: str) -> Dict[str, Any]:
     """
@@ -272,74 +439,109 @@ def run_query(user_query: str) -> Dict[str, Any]:
     
     # Ensure LLM is loaded
     load_llm()
-    
-    # Step 1: Embed the query
-    query_embedding = embedder.encode(user_query).tolist()
-    
+
+    cache = get_cache()
+
+    # Step 1: Embed the query (cached by content hash)
+    query_key = make_key("all-MiniLM-L6-v2", user_query)
+    query_embedding = cache.get_emb(query_key)
+    if query_embedding is None:
+        # Normalized, matching the retriever's batcher: both paths share
+        # this SQLite key, so one convention must hold for the store
+        query_embedding = _get_embedder().encode(user_query, normalize_embeddings=True)
+        cache.put_emb(query_key, query_embedding)
+
     # Step 2: Determine if MCP integration is needed
     needs_mcp = needs_mcp_integration(user_query)
-    
-    # Step 3: Retrieve relevant documents using RAG
-    rag_snippets = hybrid_search(user_query, k=5)
-    
-    # Step 4: Classify the retrieved snippets
-    tags = {}
-    for snippet in rag_snippets:
-        snippet_id = snippet.get("id")
-        content = snippet.get("content", "")
-        
-        # Get classification tags
-        classification_result = classifier.get_all_labels_above_threshold(content, threshold=0.3)
-        tags[snippet_id] = classification_result
-    
-    # Step 5: Call MCP if needed
-    mcp_data = {}  # Initialize as empty dict instead of None
+
+    # Step 3: Kick off retrieval and the MCP search concurrently so the
+    # MCP HTTP round-trip overlaps with retrieval and classification.
+    # The embedding from step 1 is threaded through so the retriever
+    # doesn't run a second encoder forward pass for the same query.
+    rag_future = _POOL.submit(
+        hybrid_search, user_query, k=5, precomputed_embedding=query_embedding
+    )
+
+    mcp_search_future = None
     if needs_mcp:
         # Extract potential entities
         entities = extract_entities(user_query)
-        
+
         if entities:
             # Use the first entity for simplicity
             # In a more sophisticated system, we might try multiple entities
             # or use entity disambiguation
-            entity = entities[0]
-            
-            # Search for the entity
-            search_results = call_mcp_sports_search(entity)
-            
-            if search_results.get("results"):
-                mcp_data = search_results
-                
-                # If we found a team, get its events
-                for result in search_results.get("results", []):
-                    if result.get("type") == "team":
-                        team_id = result.get("id")
-                        if team_id:
-                            events_data = call_mcp_latest_events(team_id=team_id)
-                            if events_data.get("events"):
-                                mcp_data = events_data
-                                break
+            mcp_search_future = _POOL.submit(call_mcp_sports_search, entities[0])
+
+    rag_snippets = rag_future.result()
+
+    # Step 4: Classify the retrieved snippets (cached by content hash,
+    # uncached snippets are classified together in one batched call)
+    tags = {}
+    uncached_snippets = []
+    for snippet in rag_snippets:
+        snippet_id = snippet.get("id")
+        content = snippet.get("content", "")
+
+        snippet_key = make_key("bart-large-mnli", content)
+        classification_result = cache.get_labels(snippet_key)
+        if classification_result is None:
+            uncached_snippets.append((snippet_id, snippet_key, content))
+        else:
+            tags[snippet_id] = classification_result
+
+    if uncached_snippets:
+        batch_results = _get_classifier().get_all_labels_above_threshold_batch(
+            [content for _, _, content in uncached_snippets],
+            threshold=0.3
+        )
+        for (snippet_id, snippet_key, _), snippet_labels in zip(uncached_snippets, batch_results):
+            cache.put_labels(snippet_key, snippet_labels)
+            tags[snippet_id] = snippet_labels
+    
+    # Step 5: Collect the MCP search result (issued in step 3) if needed
+    mcp_data = {}  # Initialize as empty dict instead of None
+    if mcp_search_future is not None:
+        search_results = mcp_search_future.result()
+
+        if search_results.get("results"):
+            mcp_data = search_results
+
+            # If we found a team, get its events
+            for result in search_results.get("results", []):
+                if result.get("type") == "team":
+                    team_id = result.get("id")
+                    if team_id:
+                        events_data = call_mcp_latest_events(team_id=team_id)
+                        if events_data.get("events"):
+                            mcp_data = events_data
+                            break
     
     # Step 6: Build the LLM prompt
     prompt = build_llm_prompt(user_query, rag_snippets, tags, mcp_data)
     
-    # Step 7: Generate the answer using OpenAI
-    try:
-        response = openai_client.chat.completions.create(
-            model=openai_model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that provides accurate and concise answers based on the provided context."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=150,
-            top_p=0.9
-        )
-        final_answer = response.choices[0].message.content.strip()
-        logger.info("Generated response from OpenAI")
-    except Exception as e:
-        logger.error(f"Error generating response from OpenAI: {e}")
-        final_answer = "I'm sorry, I couldn't generate a response at this time."
+    # Step 7: Generate the answer using OpenAI (cached by prompt hash)
+    prompt_key = make_key(openai_model, prompt)
+    final_answer = cache.get_answer(prompt_key)
+    if final_answer is None:
+        try:
+            response = openai_client.chat.completions.create(
+                model=openai_model,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that provides accurate and concise answers based on the provided context."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.0,
+                max_tokens=150
+            )
+            final_answer = response.choices[0].message.content.strip()
+            cache.put_answer(prompt_key, final_answer)
+            logger.info("Generated response from OpenAI")
+        except Exception as e:
+            logger.error(f"Error generating response from OpenAI: {e}")
+            final_answer = "I'm sorry, I couldn't generate a response at this time."
+    else:
+        logger.info("Answer served from cache")
     
     # Step 8: Return the results
     return {
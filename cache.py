@@ -0,0 +1,118 @@
+import logging
+import sqlite3
+import hashlib
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Constants
+CACHE_DB_PATH = "assistant_cache.db"
+
+# Separator between model name and text when building cache keys
+_KEY_SEPARATOR = "\0"
+
+
+def make_key(model_name: str, text: str) -> bytes:
+    """
+    Build a cache key from a model name and a piece of text.
+
+    Args:
+        model_name: Name of the model the cached value was produced with
+        text: The input text
+
+    Returns:
+        A 32-byte SHA-256 digest usable as a primary key
+    """
+    return hashlib.sha256((model_name + _KEY_SEPARATOR + text).encode("utf-8")).digest()
+
+
+class ResultCache:
+    """SQLite-backed cache for embeddings, classification labels, and generated answers."""
+
+    def __init__(self, db_path: str = CACHE_DB_PATH):
+        """
+        Initialize the cache and create tables if they don't exist.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS emb (key BLOB PRIMARY KEY, vec BLOB)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS cls (key BLOB PRIMARY KEY, labels TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS gen (key BLOB PRIMARY KEY, answer TEXT)")
+        self._db.commit()
+        logger.info(f"Result cache ready at {db_path}")
+
+    def get_emb(self, key: bytes) -> Optional[np.ndarray]:
+        """Return the cached embedding for key, or None on a miss."""
+        with self._lock:
+            row = self._db.execute("SELECT vec FROM emb WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put_emb(self, key: bytes, vec: np.ndarray) -> None:
+        """Store an embedding under key."""
+        blob = np.asarray(vec, dtype=np.float32).tobytes()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO emb (key, vec) VALUES (?, ?)", (key, blob))
+            self._db.commit()
+
+    def get_labels(self, key: bytes) -> Optional[List[str]]:
+        """Return the cached classification labels for key, or None on a miss."""
+        with self._lock:
+            row = self._db.execute("SELECT labels FROM cls WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0].split("\n") if row[0] else []
+
+    def put_labels(self, key: bytes, labels: List[str]) -> None:
+        """Store classification labels under key."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cls (key, labels) VALUES (?, ?)",
+                (key, "\n".join(labels))
+            )
+            self._db.commit()
+
+    def get_answer(self, key: bytes) -> Optional[str]:
+        """Return the cached generated answer for key, or None on a miss."""
+        with self._lock:
+            row = self._db.execute("SELECT answer FROM gen WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def put_answer(self, key: bytes, answer: str) -> None:
+        """Store a generated answer under key."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO gen (key, answer) VALUES (?, ?)", (key, answer))
+            self._db.commit()
+
+
+# Singleton instance for reuse
+_cache_instance = None
+
+
+def get_cache(db_path: str = CACHE_DB_PATH) -> ResultCache:
+    """
+    Get or create the shared ResultCache instance.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        ResultCache instance
+    """
+    global _cache_instance
+
+    if _cache_instance is None:
+        _cache_instance = ResultCache(db_path)
+
+    return _cache_instance
@@ -1,6 +1,8 @@
 import logging
 from typing import List, Dict, Any, Union
 
+import numpy as np
+import torch
 from transformers import pipeline
 
 # Configure logging
@@ -17,6 +19,15 @@ DEFAULT_LABELS = [
     "entertainment"
 ]
 
+# Distilled model used for the middle tier of the classification cascade
+CHEAP_MODEL_NAME = "valhalla/distilbart-mnli-12-3"
+
+# Cascade thresholds on embedding cosine similarity: above CONFIDENT the
+# similarity scores are used directly, in [AMBIGUOUS, CONFIDENT] the distilled
+# model decides, below AMBIGUOUS the full model runs
+CASCADE_CONFIDENT = 0.5
+CASCADE_AMBIGUOUS = 0.2
+
 class ContentClassifier:
     """Class for classifying text content."""
     
@@ -29,18 +40,69 @@ class ContentClassifier:
             labels: List of classification labels. If None, uses DEFAULT_LABELS
         """
         self.labels = labels or DEFAULT_LABELS
-        
+
+        # Cascade tiers, loaded lazily on first use
+        self._cheap_classifier = None
+        self._label_embedder = None
+        self._label_embeddings = None
+
         logger.info(f"Loading classification model: {model_name}")
         try:
+            use_gpu = torch.cuda.is_available()
+            self._use_gpu = use_gpu
             self.classifier = pipeline(
                 "zero-shot-classification",
-                model=model_name
+                model=model_name,
+                device=0 if use_gpu else -1,
+                torch_dtype=torch.float16 if use_gpu else None
             )
             logger.info("Classification model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading classification model: {e}")
             raise
     
+    def _get_cheap_classifier(self):
+        """Get or load the distilled zero-shot model for the middle cascade tier."""
+        if self._cheap_classifier is None:
+            logger.info(f"Loading distilled classification model: {CHEAP_MODEL_NAME}")
+            self._cheap_classifier = pipeline(
+                "zero-shot-classification",
+                model=CHEAP_MODEL_NAME,
+                device=0 if self._use_gpu else -1
+            )
+        return self._cheap_classifier
+
+    def _embedding_sims(self, texts: List[str]) -> Union[np.ndarray, None]:
+        """
+        Compute cosine similarity between texts and the default labels.
+
+        Returns an (n_texts, n_labels) array, or None if the embedder is
+        unavailable so callers fall back to the NLI models.
+        """
+        try:
+            if self._label_embeddings is None:
+                from embedder import load_embedder
+                self._label_embedder = load_embedder()
+                self._label_embeddings = np.asarray(
+                    self._label_embedder.encode(list(self.labels), normalize_embeddings=True)
+                )
+
+            text_embeddings = np.asarray(
+                self._label_embedder.encode(texts, normalize_embeddings=True)
+            )
+            return text_embeddings @ self._label_embeddings.T
+        except Exception as e:
+            logger.warning(f"Embedding prefilter unavailable: {e}")
+            return None
+
+    def _result_from_sims(self, sims: np.ndarray) -> Dict[str, Any]:
+        """Build a classification result directly from embedding similarities."""
+        order = np.argsort(sims)[::-1]
+        return {
+            "labels": [self.labels[i] for i in order],
+            "scores": [float(sims[i]) for i in order]
+        }
+
     def classify_text(self, text: str, labels: List[str] = None) -> Dict[str, Any]:
         """
         Classify the given text.
@@ -64,14 +126,28 @@ class ContentClassifier:
             # Truncate text if it's too long (model dependent)
             max_length = 1024  # Adjust based on model requirements
             truncated_text = text[:max_length] if len(text) > max_length else text
-            
+
+            # Cascade: a single embedding dot product handles the confident
+            # case, the distilled model the ambiguous band, and the full
+            # model only runs when both are unsure. Custom labels skip the
+            # cascade since label embeddings are precomputed for defaults.
+            nli_classifier = self.classifier
+            if classification_labels is self.labels:
+                sims = self._embedding_sims([truncated_text])
+                if sims is not None:
+                    top_sim = float(sims[0].max())
+                    if top_sim > CASCADE_CONFIDENT:
+                        return self._result_from_sims(sims[0])
+                    if top_sim >= CASCADE_AMBIGUOUS:
+                        nli_classifier = self._get_cheap_classifier()
+
             # Perform classification
-            result = self.classifier(
+            result = nli_classifier(
                 truncated_text,
                 candidate_labels=classification_labels,
                 multi_label=True
             )
-            
+
             logger.info(f"Text classified with top label: {result['labels'][0]}")
             return {
                 "labels": result["labels"],
@@ -81,6 +157,78 @@ class ContentClassifier:
             logger.error(f"Error classifying text: {e}")
             return {"labels": [], "scores": []}
     
+    def classify_texts(self, texts: List[str], labels: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Classify a batch of texts in a single pipeline call.
+
+        Args:
+            texts: The texts to classify
+            labels: Optional list of labels to use for this classification.
+                   If None, uses the labels provided during initialization.
+
+        Returns:
+            List of dictionaries containing classification results, one per text
+        """
+        if not texts:
+            return []
+
+        # Use provided labels or fall back to default
+        classification_labels = labels or self.labels
+
+        try:
+            # Truncate texts that are too long (model dependent)
+            max_length = 1024  # Adjust based on model requirements
+            truncated_texts = [text[:max_length] for text in texts]
+
+            results: List[Dict[str, Any]] = [None] * len(texts)
+            cheap_indices: List[int] = []
+            full_indices: List[int] = []
+
+            # Route each text through the cascade: confident embedding matches
+            # are answered directly, the ambiguous band goes to the distilled
+            # model, and only the remainder hits the full model
+            sims = self._embedding_sims(truncated_texts) if classification_labels is self.labels else None
+            if sims is None:
+                full_indices = list(range(len(texts)))
+            else:
+                for i in range(len(texts)):
+                    top_sim = float(sims[i].max())
+                    if top_sim > CASCADE_CONFIDENT:
+                        results[i] = self._result_from_sims(sims[i])
+                    elif top_sim >= CASCADE_AMBIGUOUS:
+                        cheap_indices.append(i)
+                    else:
+                        full_indices.append(i)
+
+            for indices, get_nli_classifier in (
+                (cheap_indices, self._get_cheap_classifier),
+                (full_indices, lambda: self.classifier)
+            ):
+                if not indices:
+                    continue
+
+                # Batched so the transformer forward pass is amortized
+                # across (text, label) pairs
+                batch_results = get_nli_classifier()(
+                    [truncated_texts[i] for i in indices],
+                    candidate_labels=classification_labels,
+                    multi_label=True,
+                    batch_size=8
+                )
+
+                # The pipeline returns a single dict when given a single-element list
+                if isinstance(batch_results, dict):
+                    batch_results = [batch_results]
+
+                for i, result in zip(indices, batch_results):
+                    results[i] = {"labels": result["labels"], "scores": result["scores"]}
+
+            logger.info(f"Classified batch of {len(texts)} texts")
+            return results
+        except Exception as e:
+            logger.error(f"Error classifying texts: {e}")
+            return [{"labels": [], "scores": []} for _ in texts]
+
     def get_top_label(self, text: str, threshold: float = 0.3) -> Union[str, None]:
         """
         Get the top classification label for the given text.
@@ -111,13 +259,32 @@ class ContentClassifier:
             List of labels with scores above the threshold
         """
         result = self.classify_text(text)
-        
-        labels_above_threshold = []
-        for label, score in zip(result["labels"], result["scores"]):
-            if score >= threshold:
-                labels_above_threshold.append(label)
-        
-        return labels_above_threshold
+
+        # Scores come back sorted descending, so nothing qualifies when the
+        # top score is already below the threshold
+        if not result["scores"] or result["scores"][0] < threshold:
+            return []
+
+        scores = np.asarray(result["scores"])
+        return [result["labels"][i] for i in np.flatnonzero(scores >= threshold)]
+
+    def get_all_labels_above_threshold_batch(self, texts: List[str], threshold: float = 0.3) -> List[List[str]]:
+        """
+        Get all labels with scores above the threshold for a batch of texts.
+
+        Args:
+            texts: The texts to classify
+            threshold: Minimum confidence score threshold
+
+        Returns:
+            One list of labels per input text
+        """
+        results = self.classify_texts(texts)
+
+        return [
+            [label for label, score in zip(result["labels"], result["scores"]) if score >= threshold]
+            for result in results
+        ]
 
 # Singleton instance for reuse
 _classifier_instance = None
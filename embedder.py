@@ -0,0 +1,222 @@
+import os
+import logging
+from typing import Any, List, Union
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Constants
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+INT8_MODEL_DIR = os.getenv("MINILM_INT8_DIR", "minilm-int8")
+# When set (e.g. http://tei:8080), embeddings come from a shared
+# text-embeddings-inference server instead of an in-process model
+TEI_URL = os.getenv("TEI_URL")
+TEI_TIMEOUT = 30
+# TEI rejects /embed payloads larger than its --max-client-batch-size
+# (32 by default) with HTTP 413, so per-request slices are clamped to this
+TEI_MAX_CLIENT_BATCH = 32
+
+
+class TEIEncoder:
+    """MiniLM embedder backed by a text-embeddings-inference (TEI) server.
+
+    A dedicated embedding server lets the ingest job and the query API share
+    one model instance with dynamic batching, instead of each process loading
+    its own copy. Exposes the same `encode` interface as SentenceTransformer.
+    """
+
+    def __init__(self, base_url: str = None):
+        """
+        Initialize the encoder against a TEI server.
+
+        Args:
+            base_url: Base URL of the TEI server; defaults to TEI_URL
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = (base_url or TEI_URL).rstrip("/")
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+        self.session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+        # Fail fast at load time if the server isn't reachable
+        response = self.session.get(f"{self.base_url}/health", timeout=5)
+        response.raise_for_status()
+        logger.info(f"Using TEI embedding server at {self.base_url}")
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = TEI_MAX_CLIENT_BATCH,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """
+        Encode one or more texts via the TEI server.
+
+        Args:
+            texts: A single string or list of strings to encode
+            batch_size: Number of texts per HTTP request, clamped to
+                        TEI_MAX_CLIENT_BATCH
+            convert_to_numpy: Accepted for SentenceTransformer compatibility
+            normalize_embeddings: L2-normalize the output embeddings
+            show_progress_bar: Accepted for SentenceTransformer compatibility
+
+        Returns:
+            A 1-D array for a single string, otherwise a 2-D array
+        """
+        single_input = isinstance(texts, str)
+        if single_input:
+            texts = [texts]
+
+        # Callers tuned for in-process encoders pass larger batch sizes
+        # (e.g. ingest's 64); the server would 413 on those
+        batch_size = min(batch_size, TEI_MAX_CLIENT_BATCH)
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            response = self.session.post(
+                f"{self.base_url}/embed",
+                json={
+                    "inputs": texts[start:start + batch_size],
+                    "normalize": normalize_embeddings
+                },
+                timeout=TEI_TIMEOUT
+            )
+            response.raise_for_status()
+            batches.append(np.asarray(response.json(), dtype=np.float32))
+
+        embeddings = np.concatenate(batches, axis=0)
+        return embeddings[0] if single_input else embeddings
+
+
+class ORTSentenceEncoder:
+    """MiniLM embedder backed by an int8-quantized ONNX Runtime session.
+
+    Exposes the same `encode` interface as SentenceTransformer so it can be
+    used as a drop-in replacement on CPU hosts. Export the quantized model
+    with scripts/quantize_embedder.py first.
+    """
+
+    def __init__(self, model_dir: str = INT8_MODEL_DIR):
+        """
+        Initialize the encoder from an exported ONNX model directory.
+
+        Args:
+            model_dir: Directory containing the quantized .onnx model and tokenizer
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        onnx_files = [f for f in os.listdir(model_dir) if f.endswith(".onnx")]
+        if not onnx_files:
+            raise FileNotFoundError(f"No .onnx model found in {model_dir}")
+
+        # Prefer the quantized export when both are present
+        onnx_files.sort(key=lambda name: "quantized" not in name)
+        model_path = os.path.join(model_dir, onnx_files[0])
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+        logger.info(f"Loaded ONNX embedder from {model_path}")
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """
+        Encode one or more texts into embeddings.
+
+        Args:
+            texts: A single string or list of strings to encode
+            batch_size: Number of texts per ONNX Runtime call
+            convert_to_numpy: Accepted for SentenceTransformer compatibility
+            normalize_embeddings: L2-normalize the output embeddings
+            show_progress_bar: Accepted for SentenceTransformer compatibility
+
+        Returns:
+            A 1-D array for a single string, otherwise a 2-D array
+        """
+        single_input = isinstance(texts, str)
+        if single_input:
+            texts = [texts]
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=256,
+                return_tensors="np"
+            )
+            feeds = {name: value for name, value in encoded.items() if name in self._input_names}
+            hidden_states = self.session.run(None, feeds)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden_states * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled)
+
+        embeddings = np.concatenate(batches, axis=0).astype(np.float32)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+        return embeddings[0] if single_input else embeddings
+
+
+def load_embedder(device: str = None) -> Any:
+    """
+    Load the shared sentence embedder.
+
+    Preference order: the TEI server when TEI_URL is set (one shared model
+    with dynamic batching across processes), then the int8 ONNX Runtime
+    model when an exported copy exists (faster on CPU via VNNI int8
+    kernels), then the PyTorch SentenceTransformer.
+
+    Args:
+        device: Optional torch device for the SentenceTransformer fallback
+
+    Returns:
+        An object exposing SentenceTransformer's `encode` interface
+    """
+    if TEI_URL:
+        try:
+            return TEIEncoder(TEI_URL)
+        except Exception as e:
+            logger.warning(f"TEI server unavailable, falling back to local model: {e}")
+
+    if os.path.isdir(INT8_MODEL_DIR):
+        try:
+            return ORTSentenceEncoder(INT8_MODEL_DIR)
+        except Exception as e:
+            logger.warning(f"Failed to load ONNX embedder, falling back to PyTorch: {e}")
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if device is None:
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    logger.info(f"Loading SentenceTransformer embedder on {device}")
+    model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+
+    # FP16 halves memory bandwidth and roughly doubles tensor-core
+    # throughput, with negligible effect on cosine retrieval quality
+    if device == 'cuda':
+        model = model.half()
+
+    return model
@@ -1,17 +1,35 @@
 import os
 import json
+import hashlib
 import logging
-import uuid
+import mmap
+import multiprocessing
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional, Union
 
 import chromadb
-from sentence_transformers import SentenceTransformer
+import numpy as np
 from dotenv import load_dotenv
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# orjson is a C JSON codec, several times faster than stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pypdfium2 extracts PDF text much faster than pypdf and works from
+# mmap-backed pages; fall back to PyPDFLoader when it isn't installed
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+from embedder import load_embedder
 from langchain.document_loaders import (
-    TextLoader,
     UnstructuredMarkdownLoader,
     JSONLoader,
     PyPDFLoader
@@ -33,7 +51,13 @@ load_dotenv()
 # Constants
 CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
 CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
-CHUNK_SIZE = 200  # words per chunk
+CHUNK_TOKENS = 256  # tokens per chunk, measured with the embedder's tokenizer
+CHUNK_OVERLAP_TOKENS = 32  # tokens shared between adjacent chunks
+MIN_CHUNK_TOKENS = 32  # merge trailing windows smaller than this into their neighbor
+MIN_CHUNK_CHARS = 40  # skip embedding chunks shorter than this after stripping
+EMBED_BATCH_SIZE = 64  # chunks per model.encode call
+FLUSH_SIZE = 512  # chunks per ChromaDB add call (and per Whoosh write burst)
+WRITE_QUEUE_DEPTH = 4  # background index writes in flight before encoding blocks
 COLLECTIONS = [
     "broadcast_transcripts",
     "production_metadata",
@@ -42,9 +66,27 @@ COLLECTIONS = [
 ]
 DATA_DIR = Path("data")
 WHOOSH_INDEX_DIR = Path("whoosh_index")
+# Manifest of content hashes from the last run, used to skip unchanged inputs
+INGEST_MANIFEST_PATH = Path(".ingest_manifest.json")
+# Worker processes for document loading; overridable for slow/spinning disks
+INGEST_NPROC = int(os.getenv("INGEST_NPROC", max(1, (os.cpu_count() or 2) - 1)))
+
+# Embedder singleton (int8 ONNX when exported, PyTorch otherwise), loaded
+# lazily so importing this module — e.g. for chunk_text alone — stays cheap
+_model = None
+
+def _get_model() -> Any:
+    """Get or load the shared embedding model."""
+    global _model
+
+    if _model is None:
+        _model = load_embedder()
+
+    return _model
 
-# Initialize embedder
-model = SentenceTransformer('all-MiniLM-L6-v2')
+def _model_on_gpu(model: Any) -> bool:
+    """SentenceTransformer on CUDA exposes .device; the ONNX encoder is CPU-only."""
+    return getattr(getattr(model, "device", None), "type", None) == "cuda"
 
 def connect_to_chroma() -> chromadb.HttpClient:
     """Connect to ChromaDB instance."""
@@ -64,107 +106,252 @@ def create_collections(client: chromadb.HttpClient) -> Dict[str, Any]:
         logger.info(f"Collection '{collection_name}' ready")
     return collections
 
-def read_files(collection_dir: Path) -> List[Dict[str, Any]]:
-    """Read files from a collection directory using LangChain document loaders."""
-    documents = []
-    
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a JSON string, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def load_single_document(file_str: str, category: str) -> Optional[Dict[str, Any]]:
+    """Load one file with the appropriate LangChain document loader."""
+    file_path = Path(file_str)
+    try:
+        if file_path.suffix.lower() == '.txt':
+            # Memory-map the file so the bytes come straight from the page
+            # cache instead of being double-buffered through a Python read
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    content = ""
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        content = mm[:].decode('utf-8', errors='replace')
+            logger.info(f"Loaded text file via mmap: {file_path}")
+
+        elif file_path.suffix.lower() == '.md':
+            loader = UnstructuredMarkdownLoader(file_str)
+            langchain_docs = loader.load()
+            content = langchain_docs[0].page_content
+            logger.info(f"Loaded markdown file with UnstructuredMarkdownLoader: {file_path}")
+
+        elif file_path.suffix.lower() == '.json':
+            # For JSON, we need to specify a jq-like string to identify the content
+            # This example assumes a simple structure, adjust as needed for your JSON files
+            loader = JSONLoader(
+                file_path=file_str,
+                jq_schema='.',
+                text_content=False
+            )
+            try:
+                langchain_docs = loader.load()
+                content = _json_dumps(langchain_docs[0].page_content)
+                logger.info(f"Loaded JSON file with JSONLoader: {file_path}")
+            except Exception as json_err:
+                # Fallback to simple JSON loading if the structure doesn't match
+                logger.warning(f"JSONLoader failed, falling back to simple loading: {json_err}")
+                with open(file_path, 'rb') as f:
+                    content = _json_dumps(_json_loads(f.read()))
+
+        elif file_path.suffix.lower() == '.pdf':
+            if pypdfium2 is not None:
+                # pdfium extracts text page by page without materializing a
+                # Document object per page
+                pdf = pypdfium2.PdfDocument(file_str)
+                try:
+                    pages = []
+                    for page in pdf:
+                        textpage = page.get_textpage()
+                        pages.append(textpage.get_text_range())
+                        textpage.close()
+                        page.close()
+                    content = "\n\n".join(pages)
+                    page_count = len(pages)
+                finally:
+                    pdf.close()
+                logger.info(f"Loaded PDF file with pypdfium2: {file_path} ({page_count} pages)")
+            else:
+                # Load PDF files
+                loader = PyPDFLoader(file_str)
+                langchain_docs = loader.load()
+
+                # Combine all pages into one document
+                content = "\n\n".join([doc.page_content for doc in langchain_docs])
+
+                # Add page numbers to metadata
+                page_count = len(langchain_docs)
+                logger.info(f"Loaded PDF file with PyPDFLoader: {file_path} ({page_count} pages)")
+        else:
+            logger.warning(f"Skipping unsupported file type: {file_path}")
+            return None
+
+        # Extract metadata from filename or content
+        metadata = {
+            "source": file_str,
+            "filename": file_path.name,
+            "date": file_path.stat().st_mtime,  # Use file modification time as a fallback
+            "category": category
+        }
+
+        logger.info(f"Successfully processed file: {file_path}")
+        return {
+            "content": content,
+            "metadata": metadata
+        }
+    except Exception as e:
+        logger.error(f"Error reading file {file_path}: {e}")
+        return None
+
+def _file_sha256(path: str) -> str:
+    """Compute the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _load_manifest() -> Dict[str, Any]:
+    """Load the ingest manifest recording what the last run indexed."""
+    try:
+        with open(INGEST_MANIFEST_PATH, 'rb') as f:
+            return _json_loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_manifest(manifest: Dict[str, Any]) -> None:
+    """Persist the ingest manifest for the next run."""
+    with open(INGEST_MANIFEST_PATH, 'w') as f:
+        f.write(_json_dumps(manifest))
+
+def read_files(collection_dir: Path, file_hashes: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """Read files from a collection directory, loading them concurrently.
+
+    When `file_hashes` (the manifest's path -> sha256 map) is given, files
+    whose content hash matches the previous run are skipped entirely —
+    re-embedding unchanged files is the most expensive no-op in the
+    pipeline — and the map is updated with the hashes of loaded files.
+    """
     if not collection_dir.exists():
         logger.warning(f"Directory {collection_dir} does not exist")
-        return documents
-    
-    for file_path in collection_dir.glob("**/*"):
-        if file_path.is_file():
+        return []
+
+    # os.walk avoids pathlib's per-entry stat overhead during traversal
+    file_paths = []
+    for root, _, files in os.walk(collection_dir):
+        for name in files:
+            file_paths.append(os.path.join(root, name))
+
+    # Hashing is cheap next to embedding, so compare content hashes against
+    # the manifest and only load files that are new or changed
+    new_hashes: Dict[str, str] = {}
+    if file_hashes is not None:
+        changed_paths = []
+        for path in file_paths:
             try:
-                # Use appropriate LangChain loader based on file type
-                file_str = str(file_path)
-                
-                if file_path.suffix.lower() == '.txt':
-                    loader = TextLoader(file_str, encoding='utf-8')
-                    langchain_docs = loader.load()
-                    content = langchain_docs[0].page_content
-                    logger.info(f"Loaded text file with TextLoader: {file_path}")
-                    
-                elif file_path.suffix.lower() == '.md':
-                    loader = UnstructuredMarkdownLoader(file_str)
-                    langchain_docs = loader.load()
-                    content = langchain_docs[0].page_content
-                    logger.info(f"Loaded markdown file with UnstructuredMarkdownLoader: {file_path}")
-                    
-                elif file_path.suffix.lower() == '.json':
-                    # For JSON, we need to specify a jq-like string to identify the content
-                    # This example assumes a simple structure, adjust as needed for your JSON files
-                    loader = JSONLoader(
-                        file_path=file_str,
-                        jq_schema='.',
-                        text_content=False
-                    )
-                    try:
-                        langchain_docs = loader.load()
-                        content = json.dumps(langchain_docs[0].page_content)
-                        logger.info(f"Loaded JSON file with JSONLoader: {file_path}")
-                    except Exception as json_err:
-                        # Fallback to simple JSON loading if the structure doesn't match
-                        logger.warning(f"JSONLoader failed, falling back to simple loading: {json_err}")
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = json.dumps(json.load(f))
-                
-                elif file_path.suffix.lower() == '.pdf':
-                    # Load PDF files
-                    loader = PyPDFLoader(file_str)
-                    langchain_docs = loader.load()
-                    
-                    # Combine all pages into one document
-                    content = "\n\n".join([doc.page_content for doc in langchain_docs])
-                    
-                    # Add page numbers to metadata
-                    page_count = len(langchain_docs)
-                    logger.info(f"Loaded PDF file with PyPDFLoader: {file_path} ({page_count} pages)")
-                else:
-                    logger.warning(f"Skipping unsupported file type: {file_path}")
-                    continue
-                
-                # Extract metadata from filename or content
-                metadata = {
-                    "source": str(file_path),
-                    "filename": file_path.name,
-                    "date": file_path.stat().st_mtime,  # Use file modification time as a fallback
-                    "category": collection_dir.name
-                }
-                
-                documents.append({
-                    "content": content,
-                    "metadata": metadata
-                })
-                logger.info(f"Successfully processed file: {file_path}")
-            except Exception as e:
-                logger.error(f"Error reading file {file_path}: {e}")
-    
+                file_hash = _file_sha256(path)
+            except OSError as e:
+                logger.error(f"Error hashing file {path}: {e}")
+                continue
+            if file_hashes.get(path) == file_hash:
+                logger.debug(f"Skipping unchanged file: {path}")
+                continue
+            new_hashes[path] = file_hash
+            changed_paths.append(path)
+
+        if len(changed_paths) < len(file_paths):
+            logger.info(
+                f"Skipping {len(file_paths) - len(changed_paths)} unchanged files in {collection_dir}"
+            )
+        file_paths = changed_paths
+
+    if not file_paths:
+        return []
+
+    # PDF and unstructured-markdown parsing is CPU-bound and GIL-bound, so
+    # fan file loads out across worker processes rather than threads
+    category = collection_dir.name
+    with multiprocessing.Pool(INGEST_NPROC) as pool:
+        loaded = pool.starmap(load_single_document, [(path, category) for path in file_paths])
+
+    documents = [doc for doc in loaded if doc is not None]
+
+    # Only record hashes for files that actually loaded, so failures are
+    # retried on the next run
+    if file_hashes is not None:
+        for doc in documents:
+            path = doc["metadata"]["source"]
+            if path in new_hashes:
+                file_hashes[path] = new_hashes[path]
+
     return documents
 
-def chunk_text(text: str, chunk_size: int = CHUNK_SIZE) -> List[str]:
-    """Split text into chunks using LangChain's RecursiveCharacterTextSplitter."""
-    # Convert chunk size from words to characters (approximate)
-    avg_word_length = 5  # Average English word length
-    char_size = chunk_size * avg_word_length
-    
-    # Create a text splitter with appropriate settings
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=char_size,
-        chunk_overlap=50,  # Some overlap to maintain context between chunks
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]  # Try to split on paragraphs first, then newlines, then spaces
-    )
-    
-    # Split the text
-    chunks = text_splitter.split_text(text)
-    logger.info(f"Split text into {len(chunks)} chunks using LangChain's RecursiveCharacterTextSplitter")
-    
+# Tokenizer for chunking, shared with the embedding model and loaded lazily
+_emb_tokenizer = None
+
+def _get_emb_tokenizer():
+    """Get or load the embedder's tokenizer."""
+    global _emb_tokenizer
+
+    if _emb_tokenizer is None:
+        from transformers import AutoTokenizer
+        _emb_tokenizer = AutoTokenizer.from_pretrained('sentence-transformers/all-MiniLM-L6-v2')
+
+    return _emb_tokenizer
+
+def chunk_text(
+    text: str,
+    chunk_size: int = CHUNK_TOKENS,
+    overlap: int = CHUNK_OVERLAP_TOKENS
+) -> List[str]:
+    """
+    Split text into overlapping token windows.
+
+    Windows are measured with the same tokenizer as the embedding model, so
+    each chunk fills the embedder's input instead of approximating by
+    characters, and the overlap keeps context that straddles a boundary
+    retrievable from either side.
+    """
+    tokenizer = _get_emb_tokenizer()
+    token_ids = tokenizer(text, add_special_tokens=False).input_ids
+
+    if not token_ids:
+        return []
+
+    step = max(1, chunk_size - overlap)
+    starts = list(range(0, len(token_ids), step))
+
+    # Drop a trailing window whose tokens are entirely covered by the
+    # previous window's overlap
+    if len(starts) > 1 and len(token_ids) - starts[-1] <= overlap:
+        starts.pop()
+
+    windows = [(start, min(start + chunk_size, len(token_ids))) for start in starts]
+
+    # A tiny trailing fragment dilutes retrieval and wastes an embedding
+    # slot; extend the previous window to the end of the text instead
+    if len(windows) > 1 and windows[-1][1] - windows[-1][0] < MIN_CHUNK_TOKENS:
+        windows = windows[:-2] + [(windows[-2][0], len(token_ids))]
+
+    chunks = [tokenizer.decode(token_ids[start:end]) for start, end in windows]
+    logger.debug(f"Split text into {len(chunks)} token windows")
+
     return chunks
 
-def fetch_hacker_news_data(limit: int = 1000) -> List[Dict[str, Any]]:
-    """Fetches recent stories from the BigQuery Hacker News dataset."""
+def fetch_hacker_news_data(limit: int = 1000, seen_ids: Optional[set] = None) -> Iterable[Dict[str, Any]]:
+    """Yields recent stories from the BigQuery Hacker News dataset.
+
+    Rows are streamed in pages rather than buffered into a list, so memory
+    stays bounded regardless of the query limit and downstream chunking and
+    embedding can start before the full result set has arrived. Story ids
+    already present in `seen_ids` (from a previous run's manifest) are
+    skipped, and newly yielded ids are added to the set.
+    """
     logger.info("Fetching data from BigQuery Hacker News dataset...")
-    documents = []
+    count = 0
     try:
         client = bigquery.Client()
         # Example: Fetch titles and URLs of stories from the last 7 days
@@ -181,10 +368,24 @@ def fetch_hacker_news_data(limit: int = 1000) -> List[Dict[str, Any]]:
         query_job = client.query(query)  # Make an API request.
 
         logger.info(f"Executing BigQuery query: {query}")
-        results = query_job.result()  # Waits for the job to complete.
-        logger.info(f"Fetched {results.total_rows} rows from BigQuery.")
+        # Stream results page by page instead of materializing every row
+        results = query_job.result(page_size=500)
 
+        seen_title_urls = set()
         for row in results:
+            # Skip stories already indexed by a previous run
+            if seen_ids is not None:
+                if row.id in seen_ids:
+                    continue
+                seen_ids.add(row.id)
+
+            # The same URL is often submitted several times; one copy is
+            # enough for retrieval
+            title_url = (row.title, row.url)
+            if title_url in seen_title_urls:
+                continue
+            seen_title_urls.add(title_url)
+
             content = f"Title: {row.title}\n"
             if row.text:
                 content += f"Text: {row.text}\n"
@@ -202,51 +403,57 @@ def fetch_hacker_news_data(limit: int = 1000) -> List[Dict[str, Any]]:
                 "date": story_time_unix, # Use story timestamp
                 "category": "industry_news"
             }
-            documents.append({
+            count += 1
+            yield {
                 "content": content.strip(),
                 "metadata": metadata
-            })
+            }
 
     except Exception as e:
         logger.error(f"Failed to fetch data from BigQuery: {e}")
         # Depending on requirements, you might want to raise the exception
-        # or return an empty list / handle gracefully.
+        # or yield nothing / handle gracefully.
 
-    logger.info(f"Formatted {len(documents)} documents from Hacker News.")
-    return documents
+    logger.info(f"Streamed {count} documents from Hacker News.")
 
-def setup_whoosh_index() -> None:
-    """Set up Whoosh index for keyword search."""
+@lru_cache(maxsize=1)
+def _whoosh_index() -> Any:
+    """Open (creating if necessary) the Whoosh index exactly once per process."""
     if not WHOOSH_INDEX_DIR.exists():
         WHOOSH_INDEX_DIR.mkdir(parents=True, exist_ok=True)
-    
+
     schema = Schema(
         id=ID(stored=True, unique=True),
         content=TEXT(stored=True),
         source=ID(stored=True),
         category=ID(stored=True)
     )
-    
+
     if not any(WHOOSH_INDEX_DIR.iterdir()):
         create_in(str(WHOOSH_INDEX_DIR), schema)
         logger.info(f"Created new Whoosh index in {WHOOSH_INDEX_DIR}")
     else:
         logger.info(f"Using existing Whoosh index in {WHOOSH_INDEX_DIR}")
 
-def add_to_whoosh_index(doc_id: str, content: str, metadata: Dict[str, Any]) -> None:
-    """Add a document to the Whoosh index."""
+    return open_dir(str(WHOOSH_INDEX_DIR))
+
+def setup_whoosh_index() -> Any:
+    """Set up the Whoosh index and return a writer held open for the whole run."""
+    # Bulk-load mode: one writer for the whole ingestion run, committed once
+    # at the end, so we don't pay a fsync + segment merge per document
+    return _whoosh_index().writer(limitmb=512, procs=4, multisegment=True)
+
+def add_to_whoosh_index(writer: Any, doc_id: str, content: str, metadata: Dict[str, Any]) -> None:
+    """Add or replace a document in the Whoosh index via the shared writer."""
     try:
-        ix = open_dir(str(WHOOSH_INDEX_DIR))
-        writer = ix.writer()
-        
-        writer.add_document(
+        # update_document deletes any existing entry with the same unique id
+        # first, so re-ingesting is idempotent rather than stacking duplicates
+        writer.update_document(
             id=doc_id,
             content=content,
             source=metadata.get("source", ""),
             category=metadata.get("category", "")
         )
-        
-        writer.commit()
     except Exception as e:
         logger.error(f"Error adding document to Whoosh index: {e}")
 
@@ -255,62 +462,190 @@ def process_and_index_data() -> None:
     # Connect to ChromaDB
     client = connect_to_chroma()
     collections = create_collections(client)
-    
-    # Set up Whoosh index
-    setup_whoosh_index()
-    
+
+    # Set up Whoosh index and keep one writer open for the whole run
+    whoosh_writer = setup_whoosh_index()
+
+    # Manifest from the last run: file content hashes and already-seen
+    # Hacker News story ids, so unchanged inputs skip re-embedding
+    manifest = _load_manifest()
+    file_hashes = manifest.setdefault("files", {})
+    hn_seen_ids = set(manifest.get("hn_story_ids", []))
+
+    # Background writers: Chroma and Whoosh writes are I/O-bound sinks, so
+    # they run off the encoding critical path while the next batch encodes.
+    # The Whoosh writer is not thread-safe, so its writes are serialized.
+    writer_pool = ThreadPoolExecutor(max_workers=2)
+    write_futures: List[Any] = []
+    whoosh_write_lock = threading.Lock()
+
+    def write_batch(collection: Any, ids: List[str], embeddings: np.ndarray,
+                    metadatas: List[Dict[str, Any]], chunks: List[str]) -> None:
+        """Write one embedded batch to ChromaDB and Whoosh."""
+        # Upsert to ChromaDB in a single call; with deterministic IDs this
+        # makes re-ingestion idempotent
+        collection.upsert(
+            ids=ids,
+            embeddings=embeddings.tolist(),
+            metadatas=metadatas,
+            documents=chunks
+        )
+
+        # Add to Whoosh index
+        with whoosh_write_lock:
+            for doc_id, chunk, chunk_metadata in zip(ids, chunks, metadatas):
+                add_to_whoosh_index(whoosh_writer, doc_id, chunk, chunk_metadata)
+
+    def drain_writes(max_pending: int) -> None:
+        """Block until at most max_pending background writes are in flight."""
+        while len(write_futures) > max_pending:
+            exc = write_futures.pop(0).exception()
+            if exc is not None:
+                logger.error(f"Background index write failed: {exc}")
+
     # Process each collection
-    for collection_name in COLLECTIONS:
-        documents = [] # Initialize documents list
-        if collection_name == "industry_news":
-            # Fetch from BigQuery instead of local files for industry_news
-            documents = fetch_hacker_news_data()
-        else:
-            # Process other collections from local files as before
-            collection_dir = DATA_DIR / collection_name
-            documents = read_files(collection_dir)
-
-        if not documents:
-            logger.warning(f"No documents found or fetched for {collection_name}")
-            continue
-        
-        logger.info(f"Processing {len(documents)} documents for {collection_name}")
-        
-        # Process each document (common logic for all sources)
-        for doc in documents:
-            content = doc["content"]
-            metadata = doc["metadata"]
-            
-            # Chunk the document
-            chunks = chunk_text(content)
-            
-            # Process each chunk
-            for i, chunk in enumerate(chunks):
-                # Generate a unique ID
-                doc_id = str(uuid.uuid4())
-                
-                # Update metadata with chunk info
-                chunk_metadata = metadata.copy()
-                chunk_metadata["chunk_index"] = i
-                chunk_metadata["total_chunks"] = len(chunks)
-                
-                # Generate embedding
-                embedding = model.encode(chunk)
-                
-                # Add to ChromaDB
-                collections[collection_name].add(
-                    ids=[doc_id],
-                    embeddings=[embedding.tolist()],
-                    metadatas=[chunk_metadata],
-                    documents=[chunk]
-                )
-                
-                # Add to Whoosh index
-                add_to_whoosh_index(doc_id, chunk, chunk_metadata)
-                
-                logger.debug(f"Indexed chunk {i+1}/{len(chunks)} from {metadata['source']}")
-        
-        logger.info(f"Completed indexing for {collection_name}")
+    try:
+        for collection_name in COLLECTIONS:
+            if collection_name == "industry_news":
+                # Fetch from BigQuery instead of local files for industry_news;
+                # this is a generator, so rows stream straight into the
+                # chunk/embed buffers without being held in memory first
+                documents = fetch_hacker_news_data(seen_ids=hn_seen_ids)
+            else:
+                # Process other collections from local files as before
+                collection_dir = DATA_DIR / collection_name
+                documents = read_files(collection_dir, file_hashes)
+
+            logger.info(f"Processing documents for {collection_name}")
+            doc_count = 0
+
+            # Content hashes of chunks already indexed this run, so identical
+            # overlapping windows across documents are only embedded once
+            seen_hashes = set()
+
+            # Buffers for batched embedding and indexing
+            pending_ids: List[str] = []
+            pending_chunks: List[str] = []
+            pending_metadatas: List[Dict[str, Any]] = []
+
+            def flush_pending() -> None:
+                """Embed and index all buffered chunks in one batched call."""
+                if not pending_chunks:
+                    return
+
+                # Encode in ascending length order so each batch pads to
+                # similar sequence lengths instead of the buffer's maximum
+                order = sorted(range(len(pending_chunks)), key=lambda i: len(pending_chunks[i]))
+
+                # Encode the whole buffer at once so tokenization and the
+                # transformer forward pass are amortized across chunks. On
+                # GPU, keep the result on device across all batches and pay
+                # one device-to-host copy per flush instead of one per batch
+                sorted_texts = [pending_chunks[i] for i in order]
+                model = _get_model()
+                if _model_on_gpu(model):
+                    sorted_embeddings = model.encode(
+                        sorted_texts,
+                        batch_size=EMBED_BATCH_SIZE,
+                        convert_to_tensor=True,
+                        show_progress_bar=False,
+                        normalize_embeddings=True
+                    ).cpu().numpy()
+                else:
+                    sorted_embeddings = model.encode(
+                        sorted_texts,
+                        batch_size=EMBED_BATCH_SIZE,
+                        convert_to_numpy=True,
+                        show_progress_bar=False,
+                        normalize_embeddings=True
+                    )
+
+                # Scatter embeddings back into buffer order
+                embeddings = np.empty_like(sorted_embeddings)
+                embeddings[order] = sorted_embeddings
+
+                # Hand the writes to a background thread so the next batch
+                # can start encoding while this one is being indexed; the
+                # task owns copies of the buffers, which are reused below
+                write_futures.append(writer_pool.submit(
+                    write_batch,
+                    collections[collection_name],
+                    list(pending_ids),
+                    embeddings,
+                    list(pending_metadatas),
+                    list(pending_chunks)
+                ))
+                drain_writes(WRITE_QUEUE_DEPTH)
+
+                logger.debug(f"Flushed {len(pending_ids)} chunks to {collection_name}")
+                pending_ids.clear()
+                pending_chunks.clear()
+                pending_metadatas.clear()
+
+            # Process each document (common logic for all sources)
+            for doc in documents:
+                doc_count += 1
+                content = doc["content"]
+                metadata = doc["metadata"]
+
+                # Chunk the document
+                chunks = chunk_text(content)
+
+                # Buffer each chunk for batched embedding
+                for i, chunk in enumerate(chunks):
+                    # Near-empty chunks (e.g. HN stories with no text body)
+                    # aren't worth an embedding slot
+                    if len(chunk.strip()) < MIN_CHUNK_CHARS:
+                        continue
+
+                    # Skip chunks whose content was already indexed this run
+                    chunk_hash = hashlib.blake2b(chunk.encode(), digest_size=16).digest()
+                    if chunk_hash in seen_hashes:
+                        continue
+                    seen_hashes.add(chunk_hash)
+
+                    # Deterministic content-hash ID: the same source/chunk
+                    # pair maps to the same ID on every run, so re-ingestion
+                    # updates entries in place instead of duplicating them
+                    doc_id = hashlib.blake2b(
+                        f"{metadata.get('source', '')}|{i}|{chunk}".encode(),
+                        digest_size=16
+                    ).hexdigest()
+
+                    # Update metadata with chunk info
+                    chunk_metadata = metadata.copy()
+                    chunk_metadata["chunk_index"] = i
+                    chunk_metadata["total_chunks"] = len(chunks)
+
+                    pending_ids.append(doc_id)
+                    pending_chunks.append(chunk)
+                    pending_metadatas.append(chunk_metadata)
+
+                    if len(pending_chunks) >= FLUSH_SIZE:
+                        flush_pending()
+
+            # Flush any remaining buffered chunks for this collection
+            flush_pending()
+
+            if doc_count == 0:
+                logger.warning(f"No documents found or fetched for {collection_name}")
+            else:
+                logger.info(f"Completed indexing of {doc_count} documents for {collection_name}")
+
+        # All collections indexed; record what this run saw so the next one
+        # can skip it (after outstanding writes have landed)
+        drain_writes(0)
+        manifest["hn_story_ids"] = sorted(hn_seen_ids)
+        _save_manifest(manifest)
+        logger.info(f"Wrote ingest manifest to {INGEST_MANIFEST_PATH}")
+
+    finally:
+        # Let in-flight background writes finish before committing
+        drain_writes(0)
+        writer_pool.shutdown(wait=True)
+        # Single commit for the whole run: one fsync + merge instead of one per chunk
+        whoosh_writer.commit(optimize=True)
+        logger.info("Committed Whoosh index")
 
 if __name__ == "__main__":
     logger.info("Starting data ingestion process")
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 from typing import Dict, Any
 
@@ -70,8 +71,10 @@ async def query(request: QueryRequest):
     logger.info(f"Received query: {user_query}")
     
     try:
-        # Process the query using the agent
-        result = run_query(user_query)
+        # Process the query using the agent; run_query is blocking (model
+        # inference and external HTTP), so offload it to a worker thread to
+        # keep the event loop free for health checks and concurrent queries
+        result = await asyncio.to_thread(run_query, user_query)
         
         logger.info(f"Query processed successfully: {user_query}")
         return QueryResponse(
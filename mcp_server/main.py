@@ -1,8 +1,10 @@
 import os
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 
-import requests
+import httpx
+from cachetools import TTLCache
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -20,6 +22,49 @@ load_dotenv()
 SPORTS_DB_API_KEY = os.getenv("SPORTS_DB_API_KEY", "YOUR_API_KEY_HERE")
 SPORTS_DB_BASE_URL = "https://www.thesportsdb.com/api/v1/json"
 MCP_SERVER_PORT = int(os.getenv("MCP_SERVER_PORT", "8001"))
+SPORTS_DB_TIMEOUT = 5
+
+# Shared async client so SportsDB calls reuse warm TCP+TLS connections
+# instead of paying a handshake per request, and so the endpoints no
+# longer block the event loop on external I/O
+_CLIENT = httpx.AsyncClient(
+    timeout=SPORTS_DB_TIMEOUT,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    transport=httpx.AsyncHTTPTransport(retries=3)
+)
+
+# Team metadata changes on a scale of days, so repeated lookups for the
+# same team can be served locally; event lookups get a short TTL since
+# scores and fixtures update while games are live
+_team_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+_events_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
+async def _get_cached_json(cache: TTLCache, key: Any, endpoint: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """Fetch a SportsDB endpoint, serving repeats from the given TTL cache."""
+    if key in cache:
+        return cache[key]
+
+    url = f"{SPORTS_DB_BASE_URL}/{SPORTS_DB_API_KEY}/{endpoint}"
+    response = await _CLIENT.get(url, params=params)
+    data = response.json()
+    cache[key] = data
+    return data
+
+async def _search_teams(name: str) -> Dict[str, Any]:
+    """Search teams by name, cached for an hour."""
+    return await _get_cached_json(_team_cache, ("search", name.lower()), "searchteams.php", {"t": name})
+
+async def _lookup_team(team_id: str) -> Dict[str, Any]:
+    """Look up a team by id, cached for an hour."""
+    return await _get_cached_json(_team_cache, ("lookup", team_id), "lookupteam.php", {"id": team_id})
+
+async def _events_last(team_id: str) -> Dict[str, Any]:
+    """Fetch a team's last events, cached briefly."""
+    return await _get_cached_json(_events_cache, ("last", team_id), "eventslast.php", {"id": team_id})
+
+async def _events_next(team_id: str) -> Dict[str, Any]:
+    """Fetch a team's next events, cached briefly."""
+    return await _get_cached_json(_events_cache, ("next", team_id), "eventsnext.php", {"id": team_id})
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -78,14 +123,13 @@ async def sports_search(search_query: SearchQuery):
     logger.info(f"Sports search request: {query}")
     
     try:
-        # Search for teams
-        teams_url = f"{SPORTS_DB_BASE_URL}/{SPORTS_DB_API_KEY}/searchteams.php"
-        teams_response = requests.get(teams_url, params={"t": query})
-        teams_data = teams_response.json()
-        
-        # Search for players
+        # Team and player searches are independent, so issue them
+        # concurrently; wall-clock is the slower of the two instead of the sum
         players_url = f"{SPORTS_DB_BASE_URL}/{SPORTS_DB_API_KEY}/searchplayers.php"
-        players_response = requests.get(players_url, params={"p": query})
+        teams_data, players_response = await asyncio.gather(
+            _search_teams(query),
+            _CLIENT.get(players_url, params={"p": query})
+        )
         players_data = players_response.json()
         
         # Combine results
@@ -148,9 +192,7 @@ async def latest_events(query: TeamEventsQuery):
     try:
         # If only team name is provided, search for the team first
         if not team_id and team_name:
-            teams_url = f"{SPORTS_DB_BASE_URL}/{SPORTS_DB_API_KEY}/searchteams.php"
-            teams_response = requests.get(teams_url, params={"t": team_name})
-            teams_data = teams_response.json()
+            teams_data = await _search_teams(team_name)
             
             if not teams_data.get("teams"):
                 raise HTTPException(status_code=404, detail=f"Team not found: {team_name}")
@@ -165,9 +207,7 @@ async def latest_events(query: TeamEventsQuery):
             }
         else:
             # Get team info
-            team_url = f"{SPORTS_DB_BASE_URL}/{SPORTS_DB_API_KEY}/lookupteam.php"
-            team_response = requests.get(team_url, params={"id": team_id})
-            team_data = team_response.json()
+            team_data = await _lookup_team(team_id)
             
             if not team_data.get("teams"):
                 raise HTTPException(status_code=404, detail=f"Team not found with ID: {team_id}")
@@ -180,15 +220,12 @@ async def latest_events(query: TeamEventsQuery):
                 "country": team_data["teams"][0].get("strCountry")
             }
         
-        # Get last 5 events
-        events_url = f"{SPORTS_DB_BASE_URL}/{SPORTS_DB_API_KEY}/eventslast.php"
-        events_response = requests.get(events_url, params={"id": team_id})
-        events_data = events_response.json()
-        
-        # Get next 5 events
-        next_events_url = f"{SPORTS_DB_BASE_URL}/{SPORTS_DB_API_KEY}/eventsnext.php"
-        next_events_response = requests.get(next_events_url, params={"id": team_id})
-        next_events_data = next_events_response.json()
+        # The last-5 and next-5 event lookups are independent once the team
+        # id is known, so fetch them concurrently
+        events_data, next_events_data = await asyncio.gather(
+            _events_last(team_id),
+            _events_next(team_id)
+        )
         
         # Process events
         events = []
@@ -240,6 +277,11 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the shared HTTP client on server shutdown."""
+    await _CLIENT.aclose()
+
 if __name__ == "__main__":
     import uvicorn
     logger.info(f"Starting MCP Server on port {MCP_SERVER_PORT}")
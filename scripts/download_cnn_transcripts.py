@@ -1,20 +1,34 @@
 #!/usr/bin/env python3
 # scripts/download_cnn_transcripts.py
 
+import asyncio
+import os
 import re
-import time
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from urllib.parse import urljoin
 
-import requests
+import aiohttp
 from bs4 import BeautifulSoup
 
+# google-re2 matches in linear time with no backtracking; fall back to the
+# stdlib engine when it isn't installed (same pattern as agent.py)
+try:
+    import re2 as _re
+except ImportError:
+    _re = re
+
 # ── Configuration ────────────────────────────────────────────────────────────────
 
 BASE_URL      = "https://transcripts.cnn.com/"
 OUTPUT_DIR    = Path(__file__).parent.parent / "data" / "broadcast_transcripts"
-REQUEST_DELAY = 1  # seconds between requests
+REQUEST_DELAY = 1   # target average seconds between request starts overall
+CONCURRENT_REQUESTS = 5  # in-flight connections allowed by the semaphore
+
+# Compiled once at import; these run against every candidate href/URL
+_TRANSCRIPT_RE = _re.compile(r"^/show/[^/]+/date/\d{4}-\d{2}-\d{2}/segment/\d+$")
+_DATE_RE = _re.compile(r"/date/(\d{4}-\d{2}-\d{2})/")
 
 # ── Logging Setup ────────────────────────────────────────────────────────────────
 
@@ -34,21 +48,39 @@ def setup_output_directory():
     else:
         logger.info(f"Output directory already exists: {OUTPUT_DIR}")
 
+# ── Fetch helper ─────────────────────────────────────────────────────────────────
+
+async def fetch_html(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str) -> str:
+    """
+    Fetch a page's HTML, rate-limited by the shared semaphore.
+
+    Each of the CONCURRENT_REQUESTS slots sleeps REQUEST_DELAY/CONCURRENT_REQUESTS
+    after its request, so the overall request rate stays ~1/REQUEST_DELAY while
+    DNS, TLS, and body reads overlap across connections.
+    """
+    async with semaphore:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            html = await resp.text()
+        await asyncio.sleep(REQUEST_DELAY / CONCURRENT_REQUESTS)
+        return html
+
 # ── Step 1: Collect show URLs ────────────────────────────────────────────────────
 
-def get_show_urls() -> list[str]:
+async def get_show_urls(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> list[str]:
     """
     Fetch the main index and return URLs for each 'show' (e.g. '/show/skc').
     """
     try:
-        resp = requests.get(BASE_URL)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        html = await fetch_html(session, semaphore, BASE_URL)
+        soup = BeautifulSoup(html, "lxml")
 
         shows = []
-        # Look for <a href="/show/<show>"> links (no deeper path)
-        for a in soup.find_all("a", href=re.compile(r"^/show/[^/]+$")):
-            shows.append(urljoin(BASE_URL, a["href"]))
+        # Look for <a href="/show/<show>"> links (no deeper path); the CSS
+        # prefix selector runs in C, the count() call rejects deeper paths
+        for a in soup.select('a[href^="/show/"]'):
+            if a["href"].count("/") == 2:
+                shows.append(urljoin(BASE_URL, a["href"]))
 
         shows = list(set(shows))  # dedupe
         logger.info(f"Found {len(shows)} show pages on index")
@@ -60,21 +92,26 @@ def get_show_urls() -> list[str]:
 
 # ── Step 2: For each show, collect transcript URLs ────────────────────────────────
 
-def get_transcript_urls_for_show(show_url: str) -> list[str]:
+async def get_transcript_urls_for_show(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    show_url: str
+) -> list[str]:
     """
     Given a show URL (e.g. '/show/skc'), fetch it and return
     transcript page URLs matching the deeper segment pattern:
     /show/<show>/date/YYYY-MM-DD/segment/NN
     """
     try:
-        resp = requests.get(show_url)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        html = await fetch_html(session, semaphore, show_url)
+        soup = BeautifulSoup(html, "lxml")
 
         transcripts = []
-        pattern = re.compile(r"^/show/[^/]+/date/\d{4}-\d{2}-\d{2}/segment/\d+$")
-        for a in soup.find_all("a", href=pattern):
-            transcripts.append(urljoin(BASE_URL, a["href"]))
+        # CSS selector narrows candidates in C; the precompiled regex only
+        # confirms the exact date/segment shape on the survivors
+        for a in soup.select('a[href^="/show/"][href*="/segment/"]'):
+            if _TRANSCRIPT_RE.match(a["href"]):
+                transcripts.append(urljoin(BASE_URL, a["href"]))
 
         transcripts = list(set(transcripts))
         logger.info(f"  {show_url.split('/')[-1]}: found {len(transcripts)} transcript segments")
@@ -86,43 +123,63 @@ def get_transcript_urls_for_show(show_url: str) -> list[str]:
 
 # ── Step 3: Extract transcript content ────────────────────────────────────────────
 
-def extract_transcript_content(transcript_url: str) -> tuple[str, dict]:
+def parse_transcript_html(html: str, transcript_url: str) -> tuple[str, dict]:
+    """
+    Extract transcript text and metadata from a page's HTML.
+
+    Pure CPU work with picklable arguments, so it can run in worker
+    processes while the event loop keeps fetching.
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    # Title
+    title_tag = soup.find("h1")
+    title = title_tag.get_text(strip=True) if title_tag else transcript_url
+
+    # Date parsed from URL
+    date_match = _DATE_RE.search(transcript_url)
+    date = date_match.group(1) if date_match else "unknown-date"
+
+    # Transcript body container; join paragraphs in one pass instead of
+    # growing the string quadratically
+    body = soup.select_one("div.cnnBodyText")
+    text = ""
+    if body:
+        lines = (p.get_text(strip=True) for p in body.select("p"))
+        text = "\n\n".join(line for line in lines if line)
+        if text:
+            text += "\n\n"
+    else:
+        logger.warning(f"No transcript content at {transcript_url}")
+
+    metadata = {
+        "title":  title,
+        "date":   date,
+        "url":    transcript_url,
+        "source": "CNN Transcripts"
+    }
+    return text, metadata
+
+async def extract_transcript_content(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    transcript_url: str,
+    executor: ProcessPoolExecutor = None
+) -> tuple[str, dict]:
     """
     Download a transcript page and extract:
       - transcript_text: the raw text paragraphs
       - metadata: title, date, url, source
+
+    Parsing is GIL-bound BeautifulSoup work, so when an executor is given
+    it runs in a worker process instead of on the event loop.
     """
     try:
-        resp = requests.get(transcript_url)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        # Title
-        title_tag = soup.find("h1")
-        title = title_tag.get_text(strip=True) if title_tag else transcript_url
-
-        # Date parsed from URL
-        date_match = re.search(r"/date/(\d{4}-\d{2}-\d{2})/", transcript_url)
-        date = date_match.group(1) if date_match else "unknown-date"
-
-        # Transcript body container
-        body = soup.find("div", class_="cnnBodyText")
-        text = ""
-        if body:
-            for p in body.find_all("p"):
-                line = p.get_text(strip=True)
-                if line:
-                    text += line + "\n\n"
-        else:
-            logger.warning(f"No transcript content at {transcript_url}")
-
-        metadata = {
-            "title":  title,
-            "date":   date,
-            "url":    transcript_url,
-            "source": "CNN Transcripts"
-        }
-        return text, metadata
+        html = await fetch_html(session, semaphore, transcript_url)
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, parse_transcript_html, html, transcript_url)
+        return parse_transcript_html(html, transcript_url)
 
     except Exception as e:
         logger.error(f"Error extracting from {transcript_url}: {e}")
@@ -152,29 +209,49 @@ def save_transcript(text: str, meta: dict) -> None:
         with open(path, "w", encoding="utf-8") as f:
             f.write(header)
             f.write(text)
-        logger.info(f"Saved {fname}")
+        logger.debug("Saved %s", fname)
     except Exception as e:
         logger.error(f"Failed to save {fname}: {e}")
 
 # ── Main Orchestration ───────────────────────────────────────────────────────────
 
-def download_all_transcripts():
+async def _download_one(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    executor: ProcessPoolExecutor
+) -> None:
+    """Download, extract, and save a single transcript segment."""
+    logger.debug("Downloading transcript: %s", url)
+    text, meta = await extract_transcript_content(session, semaphore, url, executor)
+    save_transcript(text, meta)
+
+async def download_all_transcripts():
     setup_output_directory()
-    shows = get_show_urls()
 
-    total = 0
-    for show in shows:
-        transcripts = get_transcript_urls_for_show(show)
-        for url in transcripts:
-            logger.info(f"Downloading transcript: {url}")
-            text, meta = extract_transcript_content(url)
-            save_transcript(text, meta)
-            total += 1
-            time.sleep(REQUEST_DELAY)
+    # One session for the whole run so connections are pooled; the
+    # semaphore keeps at most CONCURRENT_REQUESTS transfers in flight
+    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
+    connector = aiohttp.TCPConnector(limit=2 * CONCURRENT_REQUESTS, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        shows = await get_show_urls(session, semaphore)
+
+        # Collect transcript URLs for all shows concurrently
+        url_lists = await asyncio.gather(*(
+            get_transcript_urls_for_show(session, semaphore, show) for show in shows
+        ))
+        transcript_urls = [url for urls in url_lists for url in urls]
+
+        # Download everything; the semaphore enforces the rate limit and
+        # the process pool parses pages in parallel off the event loop
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            await asyncio.gather(*(
+                _download_one(session, semaphore, url, executor) for url in transcript_urls
+            ))
 
-    logger.info(f"Done. Downloaded {total} transcript segments.")
+    logger.info(f"Done. Downloaded {len(transcript_urls)} transcript segments.")
 
 if __name__ == "__main__":
     logger.info("=== CNN Transcript Scraper Starting ===")
-    download_all_transcripts()
+    asyncio.run(download_all_transcripts())
     logger.info("=== CNN Transcript Scraper Finished ===")
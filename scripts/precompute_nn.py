@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# scripts/precompute_nn.py
+
+"""
+Rebuild the precomputed nearest-neighbor table for frequent queries.
+
+Reads the query log written by the retriever, replays the most frequent
+queries through hybrid_search, and stores their results so the serving
+path can answer them with a dict lookup. Intended to run nightly (cron).
+"""
+
+import json
+import logging
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Allow running as `python scripts/precompute_nn.py` from the repo root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import retriever
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Constants
+TOP_QUERIES = 1000  # how many of the most frequent queries to precompute
+PRECOMPUTE_K = 20  # results stored per query; lookups slice [:k]
+
+def load_query_counts() -> Counter:
+    """Count the queries recorded in the retriever's query log."""
+    counts: Counter = Counter()
+    try:
+        with open(retriever.QUERY_LOG_PATH, encoding="utf-8") as f:
+            for line in f:
+                query = line.strip()
+                if query:
+                    counts[query] += 1
+    except FileNotFoundError:
+        logger.warning(f"No query log at {retriever.QUERY_LOG_PATH}; nothing to precompute")
+    return counts
+
+def precompute_nn() -> None:
+    """Recompute and persist results for the most frequent queries."""
+    counts = load_query_counts()
+    if not counts:
+        return
+
+    # Don't let the rebuild log its own queries, and don't serve the table
+    # being replaced or the semantic cache: clear/disable both so every
+    # replay runs the full pipeline (otherwise a frequent query within the
+    # cosine threshold of an earlier one would persist that neighbor's
+    # results into the table as its own exact-match answer)
+    retriever.LOG_QUERIES = False
+    retriever.USE_SEM_CACHE = False
+    retriever.PRECOMPUTED_NN.clear()
+
+    table = {}
+    for query, count in counts.most_common(TOP_QUERIES):
+        results = retriever.hybrid_search(query, k=PRECOMPUTE_K)
+        if results:
+            table[query] = results
+            logger.info(f"Precomputed {len(results)} results for query seen {count}x: {query!r}")
+
+    with open(retriever.PRECOMPUTED_NN_PATH, "w", encoding="utf-8") as f:
+        json.dump(table, f)
+
+    logger.info(f"Wrote {len(table)} precomputed queries to {retriever.PRECOMPUTED_NN_PATH}")
+
+if __name__ == "__main__":
+    logger.info("Starting nearest-neighbor precomputation")
+    precompute_nn()
+    logger.info("Nearest-neighbor precomputation complete")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# scripts/quantize_embedder.py
+"""One-off export of the MiniLM embedder to int8 ONNX.
+
+Writes the quantized model to the directory read by embedder.load_embedder
+(MINILM_INT8_DIR, default 'minilm-int8'). Run once per deployment host:
+
+    python scripts/quantize_embedder.py
+"""
+
+import os
+import sys
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Make the project root importable when run from scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embedder import EMBEDDING_MODEL_NAME, INT8_MODEL_DIR
+
+
+def quantize(save_dir: str = INT8_MODEL_DIR) -> None:
+    """Export the embedder to ONNX and apply dynamic int8 quantization."""
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    logger.info(f"Exporting {EMBEDDING_MODEL_NAME} to ONNX")
+    model = ORTModelForFeatureExtraction.from_pretrained(EMBEDDING_MODEL_NAME, export=True)
+
+    logger.info("Applying dynamic int8 quantization")
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantizer.quantize(
+        save_dir=save_dir,
+        quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False)
+    )
+
+    # The runtime encoder loads its tokenizer from the same directory
+    AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME).save_pretrained(save_dir)
+    logger.info(f"Quantized embedder saved to {save_dir}")
+
+
+if __name__ == "__main__":
+    quantize()